@@ -1,26 +1,35 @@
 # src/aicontextator.py
 
-import io
+import bisect
+import itertools
 import os
+import queue
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import click
 import pyperclip
 from tqdm import tqdm
 import pathspec
-import tiktoken
 import json
 import hashlib
-from typing import Any, Dict, List
+from typing import Any, Dict, List, NamedTuple, Optional, Union
 from detect_secrets.core.secrets_collection import SecretsCollection
 from detect_secrets.settings import default_settings
-import questionary
-from questionary import Style
+
+try:
+    import orjson
+except ImportError:  # Optional: only speeds up --format json output.
+    orjson = None
 
 
 # --- Utility Functions ---
 
 _CONTEXT_IGNORE_FILE = ".contextignore"
 _GIT_IGNORE_FILE = ".gitignore"
+_LISTING_CACHE_FILE = Path(".contextcache") / "listing.json"
+_CONTENT_CACHE_FILE = Path(".contextcache") / "content.json"
 
 _DEFAULT_EXCLUDE_PATTERNS = [
     ".git/",
@@ -37,19 +46,324 @@ _DEFAULT_EXCLUDE_PATTERNS = [
     ".env.*",
     "*.pyc",
     "*.log",
+    ".contextcache/",
 ]
 
+# Loaded lazily by _get_encoding(); building the BPE tables is expensive.
+_ENCODING = None
+
+# File reads are I/O-bound, so oversubscribing the CPU count overlaps syscalls.
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Directory scans overlap filesystem latency, one worker per CPU is enough.
+_WALK_WORKERS = os.cpu_count() or 1
+
+# Below this many items a progress bar costs more than it tells.
+_PROGRESS_MIN_ITEMS = 1000
+
+# Below this many files the read thread pool costs more than it saves.
+_PARALLEL_MIN_FILES = 32
+
+# Below this many files the secrets scan runs inline. A worker process costs
+# far more than a thread: on spawn platforms each one re-imports detect-secrets
+# (about a quarter second cold), while scanning a typical file takes about 1ms.
+_SECRETS_PARALLEL_MIN_FILES = 256
+
 
 def sha256_text(text: str) -> str:
     """Computes the SHA256 hash of a string."""
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+def sha256_bytes(data: bytes) -> str:
+    """Computes the SHA256 hash of raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_text_output(path: Path, text: str) -> None:
+    """Writes text as UTF-8, encoding it once and writing the bytes in one call."""
+    with open(path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+
+def _json_dumps(data: Any, level: int = 0) -> bytes:
+    """
+    Serializes data as UTF-8 JSON with an indent of 2, laid out as if nested
+    level containers deep. Uses orjson when it is installed; both encoders
+    produce the same bytes for this data.
+    """
+    if orjson is not None:
+        encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        encoded = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    # Strings never contain a raw newline, so every newline is layout.
+    return encoded.replace(b"\n", b"\n" + b"  " * level) if level else encoded
+
+
+def _write_json_with_list(f, head: dict, key: str, items, level: int, write_item):
+    """
+    Writes head, whose last key is key, with the list under key streamed item
+    by item through write_item(f, item, item_level) instead of serialized in
+    one piece.
+    """
+    encoded = _json_dumps({**head, key: []}, level)
+    if not items:
+        f.write(encoded)
+        return
+    prefix, suffix = encoded.rsplit(b"[]", 1)
+    item_indent = b"\n" + b"  " * (level + 2)
+    f.write(prefix + b"[")
+    for i, item in enumerate(items):
+        f.write(b"," + item_indent if i else item_indent)
+        write_item(f, item, level + 2)
+    f.write(b"\n" + b"  " * (level + 1) + b"]" + suffix)
+
+
+def _write_json_file_entry(f, file_meta: dict, level: int) -> None:
+    """Writes the JSON object of one file entry."""
+    f.write(_json_dumps(file_meta, level))
+
+
+def _write_json_part(f, part_info: dict, level: int) -> None:
+    """Writes the JSON object of one part, streaming its files."""
+    head = {k: v for k, v in part_info.items() if k != "files"}
+    _write_json_with_list(
+        f, head, "files", part_info["files"], level, _write_json_file_entry
+    )
+
+
+def copy_to_clipboard(context_parts: List[str]) -> None:
+    """Copies the first context part to the clipboard, warning if there are more."""
+    pyperclip.copy(context_parts[0])
+    click.secho(
+        "Success! The first part of the context has been copied to the clipboard.",
+        fg="green",
+    )
+    if len(context_parts) > 1:
+        click.secho(
+            f"Warning: Output was split into {len(context_parts)} parts. Only the first was copied.",
+            fg="yellow",
+        )
+
+
 def write_json_output(path: Path, data: Dict[str, Any]) -> None:
-    """Writes a dictionary to a JSON file."""
+    """
+    Writes the context document to a JSON file, indented like json.dump with
+    indent=2. Parts and their files are serialized one file entry at a time,
+    so the encoded document never has to exist in memory as a whole.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    head = {k: v for k, v in data.items() if k != "parts"}
+    # Streaming makes many small writes; a 1 MiB buffer batches them.
+    with open(path, "wb", buffering=1 << 20) as f:
+        _write_json_with_list(f, head, "parts", data["parts"], 0, _write_json_part)
+
+
+class _IgnoreMatcher:
+    """
+    Matches relative posix paths against gitignore-style patterns with a
+    few pre-compiled regexes instead of looping over pathspec patterns.
+
+    The last matching pattern decides in gitignore semantics (negations
+    included). Patterns are taken in reverse order and split into runs of
+    the same polarity, each compiled as one alternation; the first run that
+    matches decides. Without negations this is a single regex. The runs have
+    no capture groups, which would make every attempted alternative pay for
+    every group.
+    """
+
+    # pathspec names a group in every pattern regex; duplicates cannot be combined.
+    _NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+
+    def __init__(self, patterns: list[str]):
+        compiled = [
+            pathspec.patterns.GitWildMatchPattern(line) for line in reversed(patterns)
+        ]
+        self._runs = [
+            (
+                re.compile("|".join(self._anchored(pattern) for pattern in run)),
+                include,
+            )
+            for include, run in itertools.groupby(
+                (pattern for pattern in compiled if pattern.include is not None),
+                key=lambda pattern: pattern.include,
+            )
+        ]
+
+    @classmethod
+    def _anchored(cls, pattern) -> str:
+        """
+        Returns the pattern's regex without named groups, for re.match.
+        pathspec searches with each regex, and newer releases leave some
+        unanchored (e.g. for '**/'), so those are prefixed to match anywhere.
+        """
+        regex = cls._NAMED_GROUP.sub("(?:", pattern.regex.pattern)
+        return regex if regex.startswith("^") else f".*?(?:{regex})"
+
+    def match_file(self, path: str) -> bool:
+        """Returns True if the path is excluded by the patterns."""
+        for regex, include in self._runs:
+            if regex.match(path):
+                return include
+        return False
+
+    def match_dir(self, path: str) -> bool:
+        """
+        Returns True if the directory is excluded. The trailing slash lets
+        directory-only patterns such as 'node_modules/' apply.
+        """
+        return self.match_file(path + "/")
+
+
+def _progress(iterable=None, total=None, enabled: bool = True, **kwargs) -> tqdm:
+    """
+    Wraps tqdm with a capped refresh rate (at most every 0.2s and every 0.5%
+    of a known total) and no rate smoothing, and disables it for known totals
+    too small to matter, or entirely when not enabled.
+    """
+    if total is None and iterable is not None and hasattr(iterable, "__len__"):
+        total = len(iterable)
+    if not enabled:
+        kwargs["disable"] = True
+    if total is not None:
+        kwargs.setdefault("miniters", max(1, total // 200))
+        kwargs.setdefault("disable", total < _PROGRESS_MIN_ITEMS)
+    return tqdm(iterable, total=total, mininterval=0.2, smoothing=0, **kwargs)
+
+
+def _load_cache(root_dir: Path, cache_file: Path) -> dict:
+    """Loads one of the caches kept under root_dir, or an empty cache."""
+    try:
+        with open(root_dir / cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(root_dir: Path, cache_file: Path, cache: dict) -> None:
+    """Atomically replaces one of the caches kept under root_dir."""
+    path = root_dir / cache_file
+    try:
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        click.secho(f"Warning: Could not write cache '{path}': {e}", fg="yellow")
+
+
+def _get_encoding():
+    """
+    Returns the shared cl100k_base encoding, loading it on first use.
+    tiktoken is imported here so runs without token counting never load it.
+    """
+    global _ENCODING
+    if _ENCODING is None:
+        import tiktoken
+
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    return _ENCODING
+
+
+class _FileEntry(NamedTuple):
+    """One file read by _process_file, ready to be tokenized and assembled."""
+
+    relative_path_str: str
+    content: str
+    file_block: str
+    size_bytes: int
+    sha256: str
+    # {"mtime_ns", "size", "limit"} of the file as read, with a content cache.
+    stamp: Optional[dict]
+    cached_tokens: Optional[int]
+
+
+def _process_file(
+    file_path: Path,
+    relative_path_str: str,
+    max_file_bytes: Optional[int] = None,
+    content_cache: Optional[dict] = None,
+) -> Union[_FileEntry, OSError]:
+    """
+    Reads one file and builds its context block as a _FileEntry, or returns
+    the OSError instead of raising it. Files larger than max_file_bytes are
+    truncated to that many bytes, with a marker appended.
+    It only reads shared state, so it can run in a worker thread; hashlib
+    releases the GIL while hashing, so hashes are computed here too.
+
+    With a content_cache, entries are dicts of the stamp keys plus "sha256"
+    and "tokens"; one whose stamp matches supplies the hash and, if known,
+    the token count. Otherwise stamp and cached_tokens are None.
+    """
+    stamp = None
+    cached = None
+    try:
+        with open(file_path, "rb") as f:
+            if content_cache is not None:
+                st = os.fstat(f.fileno())
+                stamp = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "limit": max_file_bytes,
+                }
+                cached = content_cache.get(relative_path_str)
+                # Entries come from a file on disk; malformed ones are misses.
+                if (
+                    not isinstance(cached, dict)
+                    or "sha256" not in cached
+                    or "tokens" not in cached
+                    or any(cached.get(key) != value for key, value in stamp.items())
+                ):
+                    cached = None
+            if max_file_bytes is None:
+                raw = f.read()
+            else:
+                # One byte past the limit tells whether the file is larger,
+                # without reading a huge generated file in full.
+                raw = f.read(max_file_bytes + 1)
+            # The buffer length is the size; only truncated files need a stat.
+            size_bytes = len(raw)
+            truncated = max_file_bytes is not None and size_bytes > max_file_bytes
+            if truncated:
+                size_bytes = os.fstat(f.fileno()).st_size
+                raw = raw[:max_file_bytes]
+    except OSError as e:
+        return e
+
+    # Decoding the whole buffer at once skips the TextIOWrapper layer; newlines
+    # are normalized the way text mode would have.
+    try:
+        content = raw.decode("utf-8")
+        unchanged = not truncated
+    except UnicodeDecodeError:
+        content = raw.decode("utf-8", errors="ignore")
+        unchanged = False
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+        unchanged = False
+    if truncated:
+        content += "\n... [truncated] ..."
+
+    file_block = f"\n--- FILE: {relative_path_str} ---\n{content}\n"
+    if cached is not None:
+        return _FileEntry(
+            relative_path_str,
+            content,
+            file_block,
+            size_bytes,
+            cached["sha256"],
+            stamp,
+            cached["tokens"],
+        )
+
+    # The hash is of the content as included; when that is byte-for-byte the
+    # file, the raw buffer is hashed directly instead of re-encoding it.
+    sha256 = sha256_bytes(raw) if unchanged else sha256_text(content)
+    return _FileEntry(
+        relative_path_str, content, file_block, size_bytes, sha256, stamp, None
+    )
 
 
 # --- Core Logic ---
@@ -116,27 +430,41 @@ def load_ignore_patterns(root_dir: Path) -> list[str]:
         if p.is_file():
             try:
                 with open(p, "r", encoding="utf-8") as f:
-                    lines = [line.strip() for line in f.readlines()]
-                    cleaned = [
-                        line for line in lines if line and not line.startswith("#")
-                    ]
-                    patterns.extend(cleaned)
+                    stripped = (line.strip() for line in f)
+                    patterns.extend(
+                        line for line in stripped if line and not line.startswith("#")
+                    )
                     click.echo(f"Found and loaded '{fname}'.")
             except Exception as e:
                 click.secho(f"Warning: Could not read '{fname}': {e}", fg="yellow")
     return patterns
 
 
+def load_ignore_spec(root_dir: Path, extra_patterns: list[str]) -> _IgnoreMatcher:
+    """
+    Loads the ignore patterns of root_dir plus extra_patterns and compiles
+    them once into a matcher shared by directory pruning and file filtering.
+    """
+    patterns = load_ignore_patterns(root_dir)
+    patterns.extend(extra_patterns)
+    return _IgnoreMatcher(patterns)
+
+
 def filter_project_files(
-    root_dir: Path, exclude_cli_patterns: list[str], include_extensions: list[str]
-) -> list[Path]:
+    root_dir: Path,
+    exclude_cli_patterns: list[str],
+    include_extensions: list[str],
+    use_cache: bool = False,
+    show_progress: bool = True,
+) -> list[tuple[Path, str]]:
     """
     Applies all exclusion and inclusion rules to return the list
-    of files to be included in the context.
+    of files to be included in the context, as (path, relative_posix_path)
+    pairs so later stages never have to recompute the relative path.
+    With use_cache, directory listings are reused from .contextcache/
+    for every directory whose mtime has not changed since the last run.
     """
-    all_patterns = load_ignore_patterns(root_dir)
-    all_patterns.extend(exclude_cli_patterns)
-    spec = pathspec.PathSpec.from_lines("gitwildmatch", all_patterns)
+    spec = load_ignore_spec(root_dir, exclude_cli_patterns)
 
     final_include_extensions = include_extensions or [
         ".py",
@@ -157,83 +485,298 @@ def filter_project_files(
         "readme.md",
     ]
 
-    all_files = [p for p in root_dir.rglob("*") if p.is_file()]
-
-    filtered_files = []
-    for path in tqdm(all_files, desc="Filtering files"):
-        relative_path_str = path.relative_to(root_dir).as_posix()
-        if not spec.match_file(relative_path_str) and any(
-            path.name.endswith(ext) for ext in final_include_extensions
-        ):
-            filtered_files.append(path)
+    # str.endswith accepts a tuple and loops over the suffixes in C.
+    ext_tuple = tuple(final_include_extensions)
+    listing_cache = _load_cache(root_dir, _LISTING_CACHE_FILE) if use_cache else None
+    filtered_files = _walk_project_files(
+        root_dir, spec, ext_tuple, listing_cache, show_progress
+    )
+    if listing_cache is not None:
+        _save_cache(root_dir, _LISTING_CACHE_FILE, listing_cache)
+    # Workers finish in arbitrary order; sort for a deterministic result.
+    filtered_files.sort(key=lambda entry: entry[1])
 
     return filtered_files
 
 
-def generate_tree_view(root_dir: Path, filtered_files: list[Path]) -> str:
+def _scan_dir_entries(dir_path: str):
+    """
+    Yields (name, is_dir, is_file) for every entry of dir_path, streaming
+    straight from os.scandir. Both checks use the cached dirent type, so
+    regular entries cost no stat(); is_file is only asked of non-directories.
+    """
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            yield entry.name, is_dir, not is_dir and entry.is_file()
+
+
+def _cached_dir_entries(cached: Any, mtime_ns: int) -> Optional[list]:
+    """
+    Returns the (name, is_dir, is_file) entries of a listing cache entry, or
+    None if it is stale or malformed. The cache is a file on disk, so its
+    shape is checked before the walk trusts it.
+    """
+    if not (
+        isinstance(cached, (list, tuple))
+        and len(cached) == 2
+        and cached[0] == mtime_ns
+        and isinstance(cached[1], list)
+    ):
+        return None
+    for entry in cached[1]:
+        if not (
+            isinstance(entry, (list, tuple))
+            and len(entry) == 3
+            and isinstance(entry[0], str)
+            and isinstance(entry[1], bool)
+            and isinstance(entry[2], bool)
+        ):
+            return None
+    return cached[1]
+
+
+def _walk_project_files(
+    root_dir: Path,
+    spec: _IgnoreMatcher,
+    include_extensions: tuple[str, ...],
+    listing_cache: Optional[dict] = None,
+    show_progress: bool = True,
+) -> list[tuple[Path, str]]:
+    """
+    Walks root_dir with a pool of os.scandir worker threads and returns
+    (path, relative_path_str) pairs for every file that is not ignored and
+    matches one of include_extensions. Ignored directories are pruned before
+    they are queued, so they are never listed; as in git, a negated pattern
+    cannot re-include a file whose parent directory is ignored.
+
+    If listing_cache is given, it maps relative directory prefixes to
+    (mtime_ns, entries); unchanged directories are not rescanned, and the
+    dict is updated in place to hold exactly the directories visited.
+    """
+    dir_queue = queue.Queue()
+    result_queue = queue.Queue()
+    lock = threading.Lock()
+    # Directories queued or being scanned; the walk is done when it hits zero.
+    pending = 1
+    visited_listing = {}
+
+    def worker():
+        nonlocal pending
+        while True:
+            item = dir_queue.get()
+            if item is None:
+                return
+
+            dir_path, rel_prefix = item
+            seen = 0
+            found = []
+            error = None
+            try:
+                entries = None
+                if listing_cache is not None:
+                    # Stat before listing: a change racing the scan leaves an
+                    # outdated mtime behind, which only forces a rescan later.
+                    mtime_ns = os.stat(dir_path).st_mtime_ns
+                    entries = _cached_dir_entries(
+                        listing_cache.get(rel_prefix), mtime_ns
+                    )
+                if entries is None:
+                    entries = _scan_dir_entries(dir_path)
+                if listing_cache is not None:
+                    # Only the cache needs the listing kept around.
+                    entries = list(entries)
+                    visited_listing[rel_prefix] = (mtime_ns, entries)
+
+                for name, is_dir, is_file in entries:
+                    relative_path_str = rel_prefix + name
+                    if is_dir:
+                        if not spec.match_dir(relative_path_str):
+                            with lock:
+                                pending += 1
+                            dir_queue.put(
+                                (os.path.join(dir_path, name), relative_path_str + "/")
+                            )
+                    elif is_file:
+                        seen += 1
+                        # The suffix check is far cheaper than the ignore regex
+                        # and rejects most files, so it goes first.
+                        if name.endswith(include_extensions) and not spec.match_file(
+                            relative_path_str
+                        ):
+                            found.append((Path(dir_path, name), relative_path_str))
+            except Exception as e:
+                error = f"Warning: Could not scan '{dir_path}': {e}"
+            finally:
+                result_queue.put((seen, found, error))
+                with lock:
+                    pending -= 1
+                    finished = pending == 0
+                if finished:
+                    result_queue.put(None)
+
+    threads = [
+        threading.Thread(target=worker, daemon=True) for _ in range(_WALK_WORKERS)
+    ]
+    for thread in threads:
+        thread.start()
+    dir_queue.put((str(root_dir), ""))
+
+    # Progress and warnings are reported from this thread only.
+    matches = []
+    with _progress(
+        desc="Filtering files", unit=" files", enabled=show_progress
+    ) as progress:
+        while True:
+            result = result_queue.get()
+            if result is None:
+                break
+            seen, found, error = result
+            if error:
+                click.secho(error, fg="yellow")
+            progress.update(seen)
+            matches.extend(found)
+
+    for _ in threads:
+        dir_queue.put(None)
+    for thread in threads:
+        thread.join()
+
+    if listing_cache is not None:
+        listing_cache.clear()
+        listing_cache.update(visited_listing)
+
+    return matches
+
+
+def generate_tree_view(root_dir: Path, filtered_files: list[tuple[Path, str]]) -> str:
     """Generates a string representing the tree structure of the filtered files."""
-    tree = {}
-    for path in filtered_files:
-        relative_path = path.relative_to(root_dir)
-        parts = relative_path.parts
-        current_level = tree
-        for part in parts:
-            if part not in current_level:
-                current_level[part] = {}
-            current_level = current_level[part]
-
-    tree_lines = []
-
-    def build_tree_lines(structure, prefix=""):
-        items = sorted(structure.keys())
-        for i, name in enumerate(items):
-            connector = "└── " if i == len(items) - 1 else "├── "
-            tree_lines.append(f"{prefix}{connector}{name}")
-            if structure[name]:
-                extension = "    " if i == len(items) - 1 else "│   "
-                build_tree_lines(structure[name], prefix + extension)
-
-    tree_lines.append(f"{root_dir.name}/")
-    build_tree_lines(tree)
+    # Sorting the parts tuples once orders every level exactly like a
+    # per-level sort would, so the tree can be emitted in linear passes.
+    sorted_parts = sorted(tuple(rel.split("/")) for _, rel in filtered_files)
+
+    # Flatten into (depth, name) nodes in display order: each path only adds
+    # the components it does not share with the previous one.
+    nodes = []
+    prev_parts = ()
+    for parts in sorted_parts:
+        common = 0
+        max_common = min(len(prev_parts), len(parts))
+        while common < max_common and prev_parts[common] == parts[common]:
+            common += 1
+        for depth in range(common, len(parts)):
+            nodes.append((depth, parts[depth]))
+        prev_parts = parts
+
+    # Walking backwards, a node is the last child of its parent unless a
+    # sibling at the same depth was already seen after it.
+    is_last = [False] * len(nodes)
+    has_later_sibling = []
+    for i in range(len(nodes) - 1, -1, -1):
+        depth = nodes[i][0]
+        del has_later_sibling[depth + 1 :]
+        while len(has_later_sibling) <= depth:
+            has_later_sibling.append(False)
+        is_last[i] = not has_later_sibling[depth]
+        has_later_sibling[depth] = True
+
+    tree_lines = [f"{root_dir.name}/"]
+    prefixes = []
+    for (depth, name), last in zip(nodes, is_last):
+        del prefixes[depth:]
+        connector = "└── " if last else "├── "
+        tree_lines.append(f"{''.join(prefixes)}{connector}{name}")
+        prefixes.append("    " if last else "│   ")
     return "\n".join(tree_lines)
 
 
+def _build_file_meta(
+    relative_path_str: str,
+    content: str,
+    size_bytes: int,
+    sha256: str,
+    block_tokens: int,
+    potential_secrets: list,
+    keep_content: bool = True,
+) -> dict:
+    """
+    Builds the metadata entry of one file in a context part. Without
+    keep_content the entry leaves out the file content.
+    """
+    file_meta = {
+        "path": relative_path_str,
+        "size_bytes": size_bytes,
+        "sha256": sha256,
+        "estimated_tokens": block_tokens,
+        "potential_secrets": potential_secrets,
+    }
+    if keep_content:
+        file_meta["content"] = content
+    return file_meta
+
+
+def _split_points(item_tokens: list[int], max_tokens: Optional[int]) -> list[int]:
+    """
+    Returns the index of the first item of every part after the first, when
+    items are packed greedily into parts of at most max_tokens. An item that
+    does not fit an empty part still gets a part of its own. Split points are
+    found by bisecting the prefix sums rather than accumulating item by item.
+    """
+    if not max_tokens:
+        return []
+
+    cumulative = [0, *itertools.accumulate(item_tokens)]
+    starts = []
+    start = 0
+    while True:
+        # Largest end such that items[start:end] stay within max_tokens.
+        limit = cumulative[start] + max_tokens
+        end = bisect.bisect_right(cumulative, limit, lo=start) - 1
+        if cumulative[end] == cumulative[start]:
+            # Nothing with tokens fits: the next item overflows on its own.
+            end += 1
+        if end >= len(item_tokens):
+            return starts
+        starts.append(end)
+        start = end
+
+
 def generate_context(
     root_dir: Path,
-    filtered_files: list[Path],
+    filtered_files: list[tuple[Path, str]],
     secrets_report: dict,
     count_tokens: bool,
     max_tokens: int,
     warn_tokens: int,
     prompt_no_header: bool,
     tree_view: str,
+    max_file_bytes: Optional[int] = None,
+    content_cache: Optional[dict] = None,
+    keep_content: bool = True,
+    dedupe: bool = False,
+    show_progress: bool = True,
 ) -> tuple[list[str], list[int], list[dict]]:
-    """Generates context parts and their corresponding metadata."""
+    """
+    Generates context parts and their corresponding metadata.
+    Files larger than max_file_bytes are truncated to that size.
+    With a content_cache, hashes and token counts of unchanged files are
+    reused, and the cache is updated in place to cover this run's files.
+    Without keep_content the metadata leaves out file contents, which only
+    the JSON output needs, so they are not held twice in memory.
+    With dedupe, a file whose content repeats an earlier file's is included
+    as a one-line reference to that file instead of in full.
+    """
+    if max_file_bytes is not None and max_file_bytes < 0:
+        raise ValueError(f"max_file_bytes must not be negative, got {max_file_bytes}")
 
+    encoding = None
     if count_tokens:
         try:
-            encoding = tiktoken.get_encoding("cl100k_base")
-
-            def _count_tiktoken(text: str) -> int:
-                """Counts tokens using the tiktoken library."""
-                return len(encoding.encode(text, disallowed_special=()))
-
-            _count = _count_tiktoken
+            encoding = _get_encoding()
         except Exception as e:
             click.secho(
                 f"Error initializing tiktoken: {e}. Disabling token counting.", fg="red"
             )
-    else:
-        _count = lambda text: 0
-
-    context_parts: List[str] = []
-    token_counts: List[int] = []
-    parts_meta: List[Dict] = []
-
-    current_part_builder = io.StringIO()
-    current_token_count = 0
-    current_part_files_meta: List[Dict] = []
-    warn_triggered = False
 
     preliminary_text = ""
     if not prompt_no_header:
@@ -249,86 +792,156 @@ def generate_context(
         "<<<\n"
     )
 
-    if preliminary_text:
-        prelim_tokens = _count(preliminary_text)
-        current_part_builder.write(preliminary_text)
-        current_token_count += prelim_tokens
-        current_part_files_meta.append(
-            {
-                "path": "_aicontext_header_",
-                "size_bytes": len(preliminary_text.encode("utf-8")),
-                "sha256": sha256_text(preliminary_text),
-                "estimated_tokens": prelim_tokens,
-                "potential_secrets": [],
-            }
-        )
-
     click.echo(f"Found {len(filtered_files)} files to include. Building context...")
 
-    for file_path in tqdm(filtered_files, desc="Processing files"):
-        try:
-            relative_path = file_path.relative_to(root_dir)
-            header = f"\n--- FILE: {relative_path.as_posix()} ---\n"
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-
-            file_block = header + content + "\n"
-            block_tokens = _count(file_block)
-
-            if max_tokens and block_tokens > max_tokens:
+    # Phase 1: read and hash every file and build its block.
+    file_entries = []
+    first_path_by_sha256 = {}
+    duplicate_of = {}
+    with ThreadPoolExecutor(max_workers=_READ_WORKERS) as executor:
+        # map() yields results in order, so part assembly stays deterministic.
+        # Small projects are processed inline, where pool overhead dominates.
+        file_map = executor.map if len(filtered_files) >= _PARALLEL_MIN_FILES else map
+        results = file_map(
+            _process_file,
+            [path for path, _ in filtered_files],
+            [rel for _, rel in filtered_files],
+            itertools.repeat(max_file_bytes),
+            itertools.repeat(content_cache),
+        )
+        for (file_path, _), result in _progress(
+            zip(filtered_files, results),
+            total=len(filtered_files),
+            desc="Processing files",
+            enabled=show_progress,
+        ):
+            if isinstance(result, OSError):
+                click.secho(f"Error reading {file_path}: {result}", fg="yellow")
+                continue
+            if max_file_bytes is not None and result.size_bytes > max_file_bytes:
                 click.secho(
-                    f"\nWarning: File '{relative_path}' (~{block_tokens} tokens) is larger than max_tokens ({max_tokens}). It will be placed in a part by itself if necessary.",
+                    f"\nWarning: File '{result.relative_path_str}' ({result.size_bytes} bytes) is larger than max_file_bytes ({max_file_bytes}). Only the first {max_file_bytes} bytes are included.",
                     fg="yellow",
                 )
-
-            if (
-                max_tokens
-                and (current_token_count + block_tokens) > max_tokens
-                and current_token_count > 0
-            ):
-                context_parts.append(current_part_builder.getvalue())
-                token_counts.append(current_token_count)
-                parts_meta.append({"files": current_part_files_meta})
-                click.echo(
-                    f"\nToken limit of {max_tokens} reached. Creating a new part (Part {len(context_parts) + 1})."
+            if dedupe and result.content:
+                relative_path_str = result.relative_path_str
+                first_path = first_path_by_sha256.setdefault(
+                    result.sha256, relative_path_str
                 )
-                current_part_builder = io.StringIO()
-                current_token_count = 0
-                current_part_files_meta = []
+                if first_path != relative_path_str:
+                    duplicate_of[relative_path_str] = first_path
+                    # The cached count is for the full block, so none is kept.
+                    result = result._replace(
+                        content="",
+                        file_block=f"\n--- FILE: {relative_path_str} (identical to {first_path}) ---\n",
+                        stamp=None,
+                        cached_tokens=None,
+                    )
+            file_entries.append(result)
+
+    header_texts = [preliminary_text] if preliminary_text else []
+    if encoding is None:
+        # Without token counts no limit can ever be reached: everything goes
+        # into a single part, with no counting or split computation.
+        header_token_counts = [0] * len(header_texts)
+        block_token_counts = [0] * len(file_entries)
+    else:
+        # Phase 2: tokenize the header and every block without a cached count
+        # in a single batched call.
+        uncounted = [
+            i for i, entry in enumerate(file_entries) if entry.cached_tokens is None
+        ]
+        token_lists = encoding.encode_batch(
+            header_texts + [file_entries[i].file_block for i in uncounted],
+            num_threads=os.cpu_count() or 1,
+            disallowed_special=(),
+        )
+        token_list_lengths = [len(tokens) for tokens in token_lists]
+        header_token_counts = token_list_lengths[: len(header_texts)]
+        block_token_counts = [entry.cached_tokens for entry in file_entries]
+        for i, block_tokens in zip(uncounted, token_list_lengths[len(header_texts) :]):
+            block_token_counts[i] = block_tokens
+
+        if max_tokens:
+            for entry, block_tokens in zip(file_entries, block_token_counts):
+                if block_tokens > max_tokens:
+                    click.secho(
+                        f"\nWarning: File '{entry.relative_path_str}' (~{block_tokens} tokens) is larger than max_tokens ({max_tokens}). It will be placed in a part by itself if necessary.",
+                        fg="yellow",
+                    )
 
-            relative_path_str = relative_path.as_posix()
+    if content_cache is not None:
+        content_cache.clear()
+        for entry, block_tokens in zip(file_entries, block_token_counts):
+            if entry.stamp is None:
+                continue  # A deduplicated reference, not the file's block.
+            # Keep a previously cached count when this run did not count.
+            content_cache[entry.relative_path_str] = {
+                **entry.stamp,
+                "sha256": entry.sha256,
+                "tokens": block_tokens if encoding is not None else entry.cached_tokens,
+            }
 
-            potential_secrets = secrets_report.get(relative_path_str, [])
+    # The header and every file block are "items"; parts are contiguous
+    # runs of items, so they can be cut from prefix sums of the token counts.
+    item_texts: List[str] = []
+    item_metas: List[Dict] = []
+    item_tokens: List[int] = []
 
-            file_meta = {
-                "path": relative_path.as_posix(),
-                "size_bytes": file_path.stat().st_size,
-                "sha256": sha256_text(content),
-                "estimated_tokens": block_tokens,
-                "potential_secrets": potential_secrets,
-                "content": content,
+    for header_text, header_tokens in zip(header_texts, header_token_counts):
+        item_texts.append(header_text)
+        item_tokens.append(header_tokens)
+        item_metas.append(
+            {
+                "path": "_aicontext_header_",
+                "size_bytes": len(header_text.encode("utf-8")),
+                "sha256": sha256_text(header_text),
+                "estimated_tokens": header_tokens,
+                "potential_secrets": [],
             }
+        )
 
-            current_part_files_meta.append(file_meta)
-            current_part_builder.write(file_block)
-            current_token_count += block_tokens
-
-            if warn_tokens and current_token_count > warn_tokens and not warn_triggered:
-                click.secho(
-                    f"\nWarning: Token threshold of {warn_tokens} exceeded.",
-                    fg="yellow",
-                )
-                warn_triggered = True
+    for entry, block_tokens in zip(file_entries, block_token_counts):
+        item_texts.append(entry.file_block)
+        item_tokens.append(block_tokens)
+        file_meta = _build_file_meta(
+            entry.relative_path_str,
+            entry.content,
+            entry.size_bytes,
+            entry.sha256,
+            block_tokens,
+            secrets_report.get(entry.relative_path_str, []),
+            keep_content,
+        )
+        if entry.relative_path_str in duplicate_of:
+            file_meta["duplicate_of"] = duplicate_of[entry.relative_path_str]
+        item_metas.append(file_meta)
 
-        except Exception as e:
-            click.secho(f"Error reading {file_path}: {e}", fg="yellow")
+    part_starts = _split_points(item_tokens, max_tokens) if encoding is not None else []
 
-    current_part_builder.write(">>>\n")
+    # Phase 3: one join per part. The closing marker belongs to the last part.
+    context_parts: List[str] = []
+    token_counts: List[int] = []
+    parts_meta: List[Dict] = []
 
-    if current_part_builder.tell() > 0:
-        context_parts.append(current_part_builder.getvalue())
-        token_counts.append(current_token_count)
-        parts_meta.append({"files": current_part_files_meta})
+    bounds = [0, *part_starts, len(item_texts)]
+    for start, end in zip(bounds, bounds[1:]):
+        if context_parts:
+            click.echo(
+                f"\nToken limit of {max_tokens} reached. Creating a new part (Part {len(context_parts) + 1})."
+            )
+        part_texts = item_texts[start:end]
+        if end == len(item_texts):
+            part_texts.append(">>>\n")
+        context_parts.append("".join(part_texts))
+        token_counts.append(sum(item_tokens[start:end]))
+        parts_meta.append({"files": item_metas[start:end]})
+
+    if warn_tokens and any(count > warn_tokens for count in token_counts):
+        click.secho(
+            f"\nWarning: Token threshold of {warn_tokens} exceeded.",
+            fg="yellow",
+        )
 
     return context_parts, token_counts, parts_meta
 
@@ -395,6 +1008,33 @@ def generate_context(
     is_flag=True,
     help="Do not prepend the default meta-prompt header.",
 )
+@click.option(
+    "--max-file-bytes",
+    type=click.IntRange(min=0),
+    default=1024 * 1024,
+    show_default=True,
+    help="Truncate files larger than this many bytes (0 disables the limit).",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Reuse directory listings, file hashes and token counts cached in .contextcache/ between runs.",
+)
+@click.option(
+    "--dedupe",
+    is_flag=True,
+    help="Include files with identical content once; later copies become a reference to the first.",
+)
+@click.option(
+    "--json-inline/--no-json-inline",
+    default=False,
+    help="With --format json, embed each file's content (by default only its metadata and hash are written).",
+)
+@click.option(
+    "--no-progress",
+    is_flag=True,
+    help="Do not show progress bars (e.g. for scripts and CI).",
+)
 def cli(
     root_dir: Path,
     output: str,
@@ -409,6 +1049,11 @@ def cli(
     tree_only: bool,
     tree: bool,
     prompt_no_header: bool,
+    max_file_bytes: int,
+    cache: bool,
+    dedupe: bool,
+    json_inline: bool,
+    no_progress: bool,
 ):
     """
     A tool to consolidate project files into a single context,
@@ -421,7 +1066,13 @@ def cli(
         f"Starting context build in: {root_dir.resolve()}", fg="green", bold=True
     )
 
-    filtered_files = filter_project_files(root_dir, list(exclude), list(ext))
+    filtered_files = filter_project_files(
+        root_dir,
+        list(exclude),
+        list(ext),
+        use_cache=cache,
+        show_progress=not no_progress,
+    )
 
     if interactive:
         filtered_files = interactive_file_selector(filtered_files)
@@ -430,8 +1081,6 @@ def cli(
         click.secho("No files found for the specified criteria.", fg="yellow")
         return
 
-    secrets_report = checkSecurityIssue(filtered_files)
-
     tree_view = (
         generate_tree_view(root_dir, filtered_files) if tree or tree_only else ""
     )
@@ -441,6 +1090,9 @@ def cli(
         click.echo(tree_view)
         return
 
+    secrets_report = checkSecurityIssue(filtered_files, root_dir)
+
+    content_cache = _load_cache(root_dir, _CONTENT_CACHE_FILE) if cache else None
     context_parts, token_counts, parts_meta = generate_context(
         root_dir,
         filtered_files,
@@ -450,7 +1102,14 @@ def cli(
         warn_tokens,
         prompt_no_header,
         tree_view,
+        max_file_bytes=max_file_bytes or None,
+        content_cache=content_cache,
+        keep_content=output_format == "json" and json_inline,
+        dedupe=dedupe,
+        show_progress=not no_progress,
     )
+    if content_cache is not None:
+        _save_cache(root_dir, _CONTENT_CACHE_FILE, content_cache)
 
     if not context_parts:
         click.secho("Context is empty after processing.", fg="red")
@@ -474,28 +1133,17 @@ def cli(
             )
     else:  # text format
         if copy:
-            pyperclip.copy(context_parts[0])
-            click.secho(
-                "Success! The first part of the context has been copied to the clipboard.",
-                fg="green",
-            )
-            if len(context_parts) > 1:
-                click.secho(
-                    f"Warning: Output was split into {len(context_parts)} parts. Only the first was copied.",
-                    fg="yellow",
-                )
+            copy_to_clipboard(context_parts)
 
         if len(context_parts) == 1:
-            with open(output, "w", encoding="utf-8") as f:
-                f.write(context_parts[0])
+            write_text_output(Path(output), context_parts[0])
             click.secho(f"Success! Context saved to '{output}'", fg="green")
 
         else:
             base_name, extension = os.path.splitext(output)
             for i, part in enumerate(context_parts):
                 part_filename = f"{base_name}-part-{i + 1}{extension}"
-                with open(part_filename, "w", encoding="utf-8") as f:
-                    f.write(part)
+                write_text_output(Path(part_filename), part)
                 click.secho(
                     f"Success! Part {i + 1} saved to '{part_filename}'", fg="green"
                 )
@@ -510,17 +1158,54 @@ def cli(
         )
 
 
-def checkSecurityIssue(filtered_files):
+def _scan_secrets_chunk(root: str, relative_paths: list[str]) -> dict:
+    """
+    Scans a chunk of files under root for secrets, returning
+    {relative_path: [(type, line_number, secret_value), ...]}. Plain tuples
+    are cheap to send back from a worker process.
+    """
+    secrets = SecretsCollection(root=root)
+    with default_settings():
+        for relative_path in relative_paths:
+            secrets.scan_file(relative_path)
+    return {
+        file_path: sorted(
+            ((s.type, s.line_number, s.secret_value) for s in secrets_set),
+            key=lambda found: (found[1], found[0]),
+        )
+        for file_path, secrets_set in secrets.data.items()
+    }
+
+
+def checkSecurityIssue(filtered_files, root_dir: Path):
+    """
+    Scans the files for secrets. The report is keyed by the same relative
+    paths generate_context uses, whatever the current directory is.
+    """
     secrets_report = {}
 
     click.secho("Pre-scanning for secrets with detect-secrets engine...", fg="yellow")
 
     try:
-        secrets = SecretsCollection()
-        with default_settings():
-            filepaths_to_scan = [str(p) for p in filtered_files]
-            secrets.scan_files(*filepaths_to_scan)
-            secrets_found = secrets.data
+        relative_paths = [rel for _, rel in filtered_files]
+        workers = os.cpu_count() or 1
+        if workers == 1 or len(relative_paths) < _SECRETS_PARALLEL_MIN_FILES:
+            secrets_found = _scan_secrets_chunk(str(root_dir), relative_paths)
+        else:
+            # A few strided chunks per worker balance large directories across
+            # processes without a round trip per file, and each worker loads
+            # the detect-secrets plugins once per chunk instead of per file.
+            chunk_count = workers * 4
+            chunks = [relative_paths[i::chunk_count] for i in range(chunk_count)]
+            secrets_found = {}
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for found in executor.map(
+                    _scan_secrets_chunk,
+                    itertools.repeat(str(root_dir)),
+                    [chunk for chunk in chunks if chunk],
+                ):
+                    secrets_found.update(found)
+            secrets_found = dict(sorted(secrets_found.items()))
 
         if secrets_found:
             click.secho(
@@ -528,22 +1213,22 @@ def checkSecurityIssue(filtered_files):
                 fg="yellow",
             )
 
-            for file_path, secrets_set in secrets_found.items():
+            for file_path, secrets_list in secrets_found.items():
                 rel_path = file_path
 
                 if rel_path not in secrets_report:
                     secrets_report[rel_path] = []
 
-                for secret in secrets_set:
+                for secret_type, line_number, secret_value in secrets_list:
                     click.secho(
-                        f"!!! Potential secret {secret.type} in {rel_path} at line {secret.line_number} - {secret.secret_value}",
+                        f"!!! Potential secret {secret_type} in {rel_path} at line {line_number} - {secret_value}",
                         fg="red",
                     )
 
                     secrets_report[rel_path].append(
                         {
-                            "type": secret.type,
-                            "line": secret.line_number,
+                            "type": secret_type,
+                            "line": line_number,
                         }
                     )
     except Exception as e:
@@ -555,7 +1240,9 @@ def checkSecurityIssue(filtered_files):
     return secrets_report
 
 
-def interactive_file_selector(file_list: List[Path]) -> set[Path]:
+def interactive_file_selector(
+    file_list: List[tuple[Path, str]],
+) -> set[tuple[Path, str]]:
     """
     Interactive file selector using the questionary library.
     Allows users to select files from a checklist.
@@ -563,11 +1250,17 @@ def interactive_file_selector(file_list: List[Path]) -> set[Path]:
     if not file_list:
         return set()
 
-    root_path = Path.cwd()
-    try:
-        file_map = {str(p.relative_to(root_path)): p for p in file_list}
-    except ValueError:
-        file_map = {str(p): p for p in file_list}
+    # Only interactive runs pay for importing questionary.
+    import questionary
+    from questionary import Style
+
+    # Choices are shown relative to the current directory when every file is
+    # under it; slicing the prefix off avoids a relative_to() per file.
+    cwd_prefix = os.path.join(str(Path.cwd()), "")
+    path_strs = [str(p) for p, _ in file_list]
+    if all(path_str.startswith(cwd_prefix) for path_str in path_strs):
+        path_strs = [path_str[len(cwd_prefix) :] for path_str in path_strs]
+    file_map = dict(zip(path_strs, file_list))
 
     sorted_choices = sorted(file_map.keys())
 
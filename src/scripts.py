@@ -22,4 +22,5 @@ def lint():
 
 
 def test():
-    _run_command(["pytest"])
+    # Extra arguments go to pytest, e.g. `uv run test -n auto`.
+    _run_command(["pytest", *sys.argv[1:]])
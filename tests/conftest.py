@@ -0,0 +1,25 @@
+# tests/conftest.py
+
+import pytest
+
+import aicontextator
+
+
+class _StubEncoding:
+    """Stands in for cl100k_base: one token per started group of 4 characters."""
+
+    def encode(self, text, **kwargs):
+        return [0] * -(-len(text) // 4)
+
+    def encode_batch(self, texts, **kwargs):
+        return [self.encode(text) for text in texts]
+
+
+# aicontextator already loads the encoding once per process; this keeps the
+# suite from loading (or downloading) the real BPE tables at all. Tests that
+# need specific counts still patch _ENCODING and tiktoken.get_encoding.
+@pytest.fixture(scope="session", autouse=True)
+def stub_tiktoken_encoding():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(aicontextator, "_ENCODING", _StubEncoding())
+        yield